@@ -1,20 +1,21 @@
+import os
 import json
 import base64
-from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.primitives import serialization, hashes
 from cryptography.hazmat.primitives.asymmetric import padding
 from cryptography.hazmat.backends import default_backend
 
 def encrypt_data(data_dict, public_key_path):
     """
-    Encrypts large data using hybrid encryption (RSA + Fernet/AES).
+    Encrypts large data using hybrid encryption (RSA-OAEP + AES-256-GCM).
     
     Args:
         data_dict (dict): The configuration data to encrypt.
         public_key_path (str): Path to the RSA public key file.
         
     Returns:
-        str: The combined encrypted payload (EncryptedKey:EncryptedData).
+        str: JSON envelope {"wrapped_key", "nonce", "ct"} (all base64).
     """
     try:
         # 1. Load RSA public key
@@ -27,16 +28,16 @@ def encrypt_data(data_dict, public_key_path):
         # 2. Convert data to bytes
         data_bytes = json.dumps(data_dict).encode('utf-8')
 
-        # 3. Generate a new symmetric key (Fernet)
-        fernet_key = Fernet.generate_key()
-        f = Fernet(fernet_key)
+        # 3. Generate a new 256-bit AES key and a 96-bit nonce
+        aes_key = AESGCM.generate_key(bit_length=256)
+        nonce = os.urandom(12)
 
-        # 4. Encrypt the large data with the symmetric key
-        fernet_encrypted_data = f.encrypt(data_bytes)
+        # 4. Encrypt the large data with AES-GCM
+        ciphertext = AESGCM(aes_key).encrypt(nonce, data_bytes, None)
 
-        # 5. Encrypt the *symmetric key* with the RSA public key
-        rsa_encrypted_key = public_key.encrypt(
-            fernet_key,
+        # 5. Encrypt (wrap) the *symmetric key* with the RSA public key
+        wrapped_key = public_key.encrypt(
+            aes_key,
             padding.OAEP(
                 mgf=padding.MGF1(algorithm=hashes.SHA256()),
                 algorithm=hashes.SHA256(),
@@ -44,14 +45,12 @@ def encrypt_data(data_dict, public_key_path):
             )
         )
 
-        # 6. Base64 encode the RSA-encrypted key for safe transport
-        b64_rsa_encrypted_key = base64.b64encode(rsa_encrypted_key)
-
-        # 7. Join the two parts with a unique delimiter.
-        final_payload = b64_rsa_encrypted_key + b":" + fernet_encrypted_data
-        
-        # Return as a single utf-8 string
-        return final_payload.decode('utf-8')
+        # 6. Base64 encode every part and return them as a JSON envelope
+        return json.dumps({
+            "wrapped_key": base64.b64encode(wrapped_key).decode('ascii'),
+            "nonce": base64.b64encode(nonce).decode('ascii'),
+            "ct": base64.b64encode(ciphertext).decode('ascii'),
+        })
 
     except Exception as e:
         raise Exception(f"Encryption failed: {e}")
\ No newline at end of file
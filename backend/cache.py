@@ -48,8 +48,23 @@ def save_cache(cache_data):
     global _cache
     with _cache_lock:
         _cache = cache_data
-        try:
-            with open(CACHE_FILE, 'w') as f:
-                json.dump(_cache, f, indent=4)
-        except IOError as e:
-            logger.error(f"Failed to save cache to file: {e}")
\ No newline at end of file
+        _write_cache_file()
+
+def update_mapping(key, updates):
+    """
+    Merges 'updates' into the dict stored under 'key' and saves the cache, under the
+    cache lock. The merged dict replaces the old one (copy-on-write), so dicts already
+    handed out by load_cache() are never changed underneath their readers.
+    """
+    with _cache_lock:
+        current = _cache.get(key)
+        _cache[key] = {**(current if isinstance(current, dict) else {}), **updates}
+        _write_cache_file()
+
+def _write_cache_file():
+    """Writes the in-memory cache to the JSON file. Caller must hold _cache_lock."""
+    try:
+        with open(CACHE_FILE, 'w') as f:
+            json.dump(_cache, f, indent=4)
+    except IOError as e:
+        logger.error(f"Failed to save cache to file: {e}")
\ No newline at end of file
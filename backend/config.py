@@ -1,9 +1,10 @@
-# backend/config.py - MODIFIED TO DECRYPT CONFIG ON STARTUP
+# backend/config.py - DECRYPTS CONFIG AND BUILDS THE ENGINE ON FIRST USE
 
 import os
 import logging
 import urllib.parse
 import json
+from functools import lru_cache
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
@@ -17,12 +18,8 @@ ENCRYPTED_CONFIG_PATH = os.getenv("ENCRYPTED_CONFIG_PATH", "encrypted_db_config.
 PRIVATE_KEY_PATH = os.getenv("PRIVATE_KEY_PATH", "private_key.pem") 
 
 # -----------------------------
-# Logging Configuration
+# Logging (handlers are configured once by logger.configure_logging)
 # -----------------------------
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s - %(levelname)s - %(name)s - %(message)s"
-)
 logger = logging.getLogger("config")
 
 # -----------------------------
@@ -32,25 +29,38 @@ APP_HOST = os.getenv("APP_HOST", "0.0.0.0")
 APP_PORT = int(os.getenv("APP_PORT", 7070))
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
+# Connection pool sizing. pool_size + max_overflow is the most connections one
+# worker process can hold, so (pool_size + max_overflow) x worker count must stay
+# below SQL Server's user connection limit (sp_configure 'user connections').
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 20))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 40))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+
 # -----------------------------
 # Encrypted Database Configuration Loader
 # -----------------------------
-def load_and_decrypt_db_config():
-    """Loads and decrypts the database credentials from a secure file."""
-    
-    # 1. Check for required files
-    if not os.path.exists(PRIVATE_KEY_PATH):
-        logger.error(f"❌ Critical Error: RSA Private Key not found at {PRIVATE_KEY_PATH}")
-        raise FileNotFoundError(f"RSA Private Key not found: {PRIVATE_KEY_PATH}. Ensure it is placed in the backend/ folder.")
-    if not os.path.exists(ENCRYPTED_CONFIG_PATH):
-        logger.error(f"❌ Critical Error: Encrypted config file not found at {ENCRYPTED_CONFIG_PATH}")
-        raise FileNotFoundError(f"Encrypted config file not found: {ENCRYPTED_CONFIG_PATH}. Ensure the GUI tool saved it to the backend/ folder.")
+def _config_files_signature():
+    """Returns a cheap fingerprint (mtime + size) of the encrypted config and private key."""
+    config_stat = os.stat(ENCRYPTED_CONFIG_PATH)
+    key_stat = os.stat(PRIVATE_KEY_PATH)
+    return (
+        config_stat.st_mtime_ns, config_stat.st_size,
+        key_stat.st_mtime_ns, key_stat.st_size,
+    )
 
-    # 2. Load the encrypted payload string
-    with open(ENCRYPTED_CONFIG_PATH, 'r') as f:
+@lru_cache(maxsize=1)
+def _decrypt_db_config(signature):
+    """
+    Performs the actual RSA + symmetric decryption.
+    Memoized on the files' signature so repeated loads skip the RSA private-key operation
+    until either file is replaced.
+    """
+    # Load the encrypted payload as raw bytes (no text-mode decoding)
+    with open(ENCRYPTED_CONFIG_PATH, 'rb') as f:
         encrypted_payload = f.read()
 
-    # 3. Decrypt the payload
+    # Decrypt the payload
     try:
         decrypted_data = decrypt_data(encrypted_payload, PRIVATE_KEY_PATH)
         logger.info("✅ Database configuration decrypted successfully.")
@@ -60,73 +70,99 @@ def load_and_decrypt_db_config():
         # Stop the application if decryption fails (security measure)
         raise Exception("Failed to decrypt critical database configuration.")
 
-# Load the decrypted configuration once when the module loads
-DECRYPTED_DB_CONFIG = load_and_decrypt_db_config()
+def load_and_decrypt_db_config():
+    """Loads and decrypts the database credentials from a secure file."""
+    
+    # 1. Check for required files
+    if not os.path.exists(PRIVATE_KEY_PATH):
+        logger.error(f"❌ Critical Error: RSA Private Key not found at {PRIVATE_KEY_PATH}")
+        raise FileNotFoundError(f"RSA Private Key not found: {PRIVATE_KEY_PATH}. Ensure it is placed in the backend/ folder.")
+    if not os.path.exists(ENCRYPTED_CONFIG_PATH):
+        logger.error(f"❌ Critical Error: Encrypted config file not found at {ENCRYPTED_CONFIG_PATH}")
+        raise FileNotFoundError(f"Encrypted config file not found: {ENCRYPTED_CONFIG_PATH}. Ensure the GUI tool saved it to the backend/ folder.")
+
+    # 2. Decrypt (or reuse the cached result while the files are unchanged)
+    return dict(_decrypt_db_config(_config_files_signature()))
+
+def get_db_config() -> dict:
+    """Returns the decrypted configuration, decrypting it on first use."""
+    return load_and_decrypt_db_config()
 
 # -----------------------------
 # Database Configuration (pulled from Decrypted Data)
 # -----------------------------
 DB_DRIVER = "{ODBC Driver 17 for SQL Server}" 
-DB_SERVER = DECRYPTED_DB_CONFIG.get("DB_SERVER")
-DB_NAME = DECRYPTED_DB_CONFIG.get("DB_NAME")
-DB_USER = DECRYPTED_DB_CONFIG.get("DB_USER")
-DB_PASSWORD = DECRYPTED_DB_CONFIG.get("DB_PASSWORD")
-DB_TRUST_CERT = DECRYPTED_DB_CONFIG.get("DB_TRUST_CERT", "yes")
 
 # -----------------------------
 # ProServer Configuration (pulled from Decrypted Data)
 # -----------------------------
-PROSERVER_IP = DECRYPTED_DB_CONFIG.get("PROSERVER_IP")
-PROSERVER_PORT = int(DECRYPTED_DB_CONFIG.get("PROSERVER_PORT", "7777"))
+@lru_cache(maxsize=1)
+def get_proserver_address() -> tuple[str, int]:
+    """Returns the (ip, port) of the ProServer TCP listener."""
+    db_config = get_db_config()
+    return db_config.get("PROSERVER_IP"), int(db_config.get("PROSERVER_PORT", "7777"))
 
 # -----------------------------
 # Connection String Builder
 # -----------------------------
 def create_connection_string():
     """Builds a fully compatible SQL Server ODBC connection string for SQLAlchemy."""
+    db_config = get_db_config()
+    trust_cert = db_config.get("DB_TRUST_CERT", "yes")
     odbc_str = (
         f"DRIVER={DB_DRIVER};"
-        f"SERVER={DB_SERVER};"
-        f"DATABASE={DB_NAME};"
-        f"UID={DB_USER};"
-        f"PWD={DB_PASSWORD};"
+        f"SERVER={db_config.get('DB_SERVER')};"
+        f"DATABASE={db_config.get('DB_NAME')};"
+        f"UID={db_config.get('DB_USER')};"
+        f"PWD={db_config.get('DB_PASSWORD')};"
         f"Encrypt=no;"
-        f"TrustServerCertificate={'yes' if DB_TRUST_CERT.lower() == 'yes' else 'no'};"
+        f"TrustServerCertificate={'yes' if trust_cert.lower() == 'yes' else 'no'};"
         f"Connection Timeout=30;"
     )
 
     params = urllib.parse.quote_plus(odbc_str)
     return f"mssql+pyodbc:///?odbc_connect={params}"
 
-CONNECTION_STRING = create_connection_string()
-logger.debug("Connection string created successfully")
-
 # -----------------------------
 # SQLAlchemy Engine Setup
 # -----------------------------
-try:
-    engine = create_engine(
-        CONNECTION_STRING,
-        echo=False,
-        pool_size=5,
-        max_overflow=10,
-        pool_timeout=30,
-        pool_recycle=3600,
-    )
-    logger.info("✅ SQLAlchemy engine created successfully")
-except Exception as e:
-    logger.error(f"❌ Error creating engine: {e}")
-    raise
+@lru_cache(maxsize=1)
+def get_engine():
+    """
+    Builds the SQLAlchemy engine on first call and returns the same one afterwards.
+    Importing this module therefore no longer decrypts the config or builds the engine.
+    """
+    connection_string = create_connection_string()
+    logger.debug("Connection string created successfully")
+    try:
+        engine = create_engine(
+            connection_string,
+            echo=False,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=True,  # Transparently replace connections SQL Server has dropped
+            fast_executemany=True,  # pyodbc sends executemany() parameter sets as one batch
+        )
+        logger.info("✅ SQLAlchemy engine created successfully")
+        return engine
+    except Exception as e:
+        logger.error(f"❌ Error creating engine: {e}")
+        raise
 
 # -----------------------------
 # Session Factory
 # -----------------------------
-SessionLocal = sessionmaker(
-    bind=engine,
-    autocommit=False,
-    autoflush=False,
-    expire_on_commit=False
-)
+@lru_cache(maxsize=1)
+def get_session_factory():
+    """Returns the session factory bound to the lazily created engine."""
+    return sessionmaker(
+        bind=get_engine(),
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False
+    )
 
 # -----------------------------
 # Health Check Function
@@ -134,7 +170,7 @@ SessionLocal = sessionmaker(
 def health_check():
     """Verifies database connectivity."""
     try:
-        with engine.connect() as conn:
+        with get_engine().connect() as conn:
             conn.execute(text("SELECT 1"))
         logger.info("✅ Database connection successful for health check")
         return True
@@ -148,7 +184,7 @@ def health_check():
 @contextmanager
 def get_db_connection():
     """Provides a transactional scope around DB operations."""
-    db = SessionLocal()
+    db = get_session_factory()()
     try:
         yield db
     finally:
@@ -159,20 +195,20 @@ def get_db_connection():
 # -----------------------------
 def fetch_one(query: str, params: dict = None):
     """Fetch a single row."""
-    with engine.connect() as conn:
+    with get_engine().connect() as conn:
         result = conn.execute(text(query), params or {})
         row = result.fetchone()
         return dict(row._mapping) if row else None
 
 def fetch_all(query: str, params: dict = None):
     """Fetch all rows."""
-    with engine.connect() as conn:
+    with get_engine().connect() as conn:
         result = conn.execute(text(query), params or {})
         rows = result.fetchall()
         return [dict(row._mapping) for row in rows]
 
 def execute_query(query: str, params: dict = None):
     """Execute insert/update/delete query and return affected row count."""
-    with engine.begin() as conn:
+    with get_engine().begin() as conn:
         result = conn.execute(text(query), params or {})
         return result.rowcount
\ No newline at end of file
@@ -34,6 +34,10 @@ def init_sqlite_db():
                     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
                 )
             """)
+            # The scheduler looks buildings up by their start time every minute
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_building_times_start_time ON building_times(start_time)"
+            )
 
             # Table for ignored proevents
             conn.execute("""
@@ -1,7 +1,7 @@
 import os
 import sys
 import logging
-from logging.handlers import RotatingFileHandler
+import logging.config
 from threading import Lock
 
 class StreamToLogger:
@@ -11,112 +11,143 @@ class StreamToLogger:
     def __init__(self, logger, log_level=logging.INFO):
         self.logger = logger
         self.log_level = log_level
-        self.linebuf = ''
+        self.linebuf = []
 
     def isatty(self):
         return False
 
     def write(self, buf):
-        self.linebuf += buf
-        if '\n' in self.linebuf:
-            lines = self.linebuf.split('\n')
+        # Collect fragments in a list; only join when a full line is available
+        self.linebuf.append(buf)
+        if '\n' in buf:
+            lines = ''.join(self.linebuf).split('\n')
             for line in lines[:-1]:
                 message = line.strip()
                 if message:
                     self.logger.log(self.log_level, message)
-            self.linebuf = lines[-1]
+            self.linebuf = [lines[-1]] if lines[-1] else []
 
     def flush(self):
-        message = self.linebuf.strip()
+        message = ''.join(self.linebuf).strip()
         if message:
             self.logger.log(self.log_level, message)
-        self.linebuf = ''
+        self.linebuf = []
 
 
 _log_lock = Lock()
 _root_logger_configured = False
+_applied_log_config = None
 
+DETAILED_FORMAT = "%(asctime)s - %(levelname)s - %(name)s - %(funcName)s:%(lineno)d - %(message)s"
+BASIC_FORMAT = "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
 
-def get_logger(name):
+
+def _get_log_file():
     """
-    Creates and returns a thread-safe logger that logs to both console and file.
+    Returns the path of the application log file, creating backend/logs if needed.
     """
-    global _root_logger_configured
+    # Get the backend directory (where this logger.py file is located)
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
     
-    logger = logging.getLogger(name)
-
-    # Configure root logger only once
-    if not _root_logger_configured:
-        # Get the backend directory (where this logger.py file is located)
-        backend_dir = os.path.dirname(os.path.abspath(__file__))
-        
-        # Create logs directory path
-        log_dir = os.path.join(backend_dir, "logs")
-        
-        # Ensure the directory exists with proper permissions
-        try:
-            os.makedirs(log_dir, exist_ok=True)
-            print(f"✅ Log directory ensured at: {log_dir}")
-        except Exception as e:
-            print(f"❌ Failed to create log directory: {e}")
-            # Fall back to current directory if backend/logs fails
-            log_dir = "."
-            print(f"⚠️ Using fallback log directory: {log_dir}")
-
-        # Full path to log file
-        log_file = os.path.join(log_dir, "app.log")
-        print(f"📝 Log file will be created at: {log_file}")
-
-        # Configure root logger
-        root_logger = logging.getLogger()
-        root_logger.setLevel(logging.DEBUG)
-        
-        # Remove any existing handlers
-        root_logger.handlers.clear()
-
+    # Create logs directory path
+    log_dir = os.path.join(backend_dir, "logs")
+    
+    # Ensure the directory exists with proper permissions
+    try:
+        os.makedirs(log_dir, exist_ok=True)
+        print(f"✅ Log directory ensured at: {log_dir}")
+    except Exception as e:
+        print(f"❌ Failed to create log directory: {e}")
+        # Fall back to current directory if backend/logs fails
+        log_dir = "."
+        print(f"⚠️ Using fallback log directory: {log_dir}")
+
+    # Full path to log file
+    log_file = os.path.join(log_dir, "app.log")
+    print(f"📝 Log file will be created at: {log_file}")
+    return log_file
+
+
+def build_log_config(log_file=None):
+    """
+    Builds the single dictConfig used for the app and uvicorn: console + rotating file
+    on the root logger, with uvicorn's loggers propagating to it (no handlers of their own,
+    so records are never emitted twice). Without 'log_file' only the console is configured.
+    """
+    handlers = {
+        "console": {
+            "class": "logging.StreamHandler",
+            "stream": "ext://sys.stdout",
+            "formatter": "detailed" if log_file else "basic",
+            "level": "DEBUG",
+        },
+    }
+    if log_file:
         # File handler with rotation
+        handlers["file"] = {
+            "class": "logging.handlers.RotatingFileHandler",
+            "filename": log_file,
+            "maxBytes": 10 * 1024 * 1024,  # 10MB
+            "backupCount": 5,
+            "encoding": "utf-8",
+            "delay": True,  # Open the file on first emit, not at import
+            "formatter": "detailed",
+            "level": "DEBUG",
+        }
+
+    return {
+        "version": 1,
+        "disable_existing_loggers": False,
+        "formatters": {
+            "detailed": {"format": DETAILED_FORMAT, "datefmt": "%Y-%m-%d %H:%M:%S"},
+            "basic": {"format": BASIC_FORMAT},
+        },
+        "handlers": handlers,
+        "root": {"level": "DEBUG", "handlers": list(handlers)},
+        "loggers": {
+            "uvicorn": {"level": "DEBUG", "handlers": [], "propagate": True},
+            "uvicorn.error": {"level": "DEBUG", "handlers": [], "propagate": True},
+            "uvicorn.access": {"level": "DEBUG", "handlers": [], "propagate": True},
+        },
+    }
+
+
+def configure_logging():
+    """
+    Applies the logging configuration once per process and returns the dict that was
+    applied, so it can be handed to uvicorn as its log_config.
+    """
+    global _root_logger_configured, _applied_log_config
+
+    with _log_lock:
+        if _root_logger_configured:
+            return _applied_log_config
+
         try:
-            file_handler = RotatingFileHandler(
-                log_file,
-                maxBytes=10 * 1024 * 1024,  # 10MB
-                backupCount=5,
-                encoding="utf-8"
-            )
-            file_handler.setLevel(logging.DEBUG)
-            
-            # Console handler for live logs
-            console_handler = logging.StreamHandler(sys.stdout)
-            console_handler.setLevel(logging.DEBUG)
-            
-            # Detailed formatter
-            formatter = logging.Formatter(
-                "%(asctime)s - %(levelname)s - %(name)s - %(funcName)s:%(lineno)d - %(message)s",
-                datefmt="%Y-%m-%d %H:%M:%S"
-            )
-            
-            file_handler.setFormatter(formatter)
-            console_handler.setFormatter(formatter)
-
-            # Add both handlers to root logger
-            root_logger.addHandler(file_handler)
-            root_logger.addHandler(console_handler)
-            
+            log_file = _get_log_file()
+            # The handler opens the file lazily (delay=True), so check it is writable
+            # here; otherwise the console-only fallback below would never run
+            open(log_file, "a").close()
+            log_config = build_log_config(log_file)
+            logging.config.dictConfig(log_config)
             print(f"✅ Root logger initialized successfully")
-            _root_logger_configured = True
-            
         except Exception as e:
             print(f"❌ Failed to create log handlers: {e}")
             # At minimum, add console handler
-            console_handler = logging.StreamHandler(sys.stdout)
-            formatter = logging.Formatter(
-                "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
-            )
-            console_handler.setFormatter(formatter)
-            root_logger.addHandler(console_handler)
-            root_logger.setLevel(logging.DEBUG)
-            _root_logger_configured = True
-
-    return logger
+            log_config = build_log_config()
+            logging.config.dictConfig(log_config)
+
+        _applied_log_config = log_config
+        _root_logger_configured = True
+        return _applied_log_config
+
+
+def get_logger(name):
+    """
+    Creates and returns a thread-safe logger that logs to both console and file.
+    """
+    configure_logging()
+    return logging.getLogger(name)
 
 
 def redirect_prints_to_logging(logger):
@@ -5,33 +5,39 @@ MODIFICATIONS:
 - Added admin routes import and registration
 - Added routes to serve login.html and admin.html
 - Fixed static file serving
+- Frontend files are read once at startup and served from memory
 """
 
 import uvicorn
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import HTMLResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import os
+import hashlib
+import mimetypes
 import logging
 
-from logger import get_logger, redirect_prints_to_logging
+from logger import configure_logging, get_logger, redirect_prints_to_logging
 from routes import router as api_router
 from admin_routes import router as admin_router
 from services.scheduler_service import start_scheduler
 from database_setup import init_sqlite_db
+from config import get_engine
 
 # --- Configuration ---
 APP_HOST = "127.0.0.1"
 APP_PORT = 7070
 LOG_LEVEL = "debug"
 
-# Initialize logger FIRST
+# Initialize logger FIRST (the same config is reused by uvicorn below)
+LOG_CONFIG = configure_logging()
 logger = get_logger(__name__)
 
-# Redirect all print statements to logger
-redirect_prints_to_logging(logger)
+# Redirect all print statements to logger (opt-in: it routes every stdout/stderr
+# write through Python-level line splitting)
+if os.getenv("REDIRECT_PRINTS_TO_LOGGING", "0") == "1":
+    redirect_prints_to_logging(logger)
 
 logger.info("="*50)
 logger.info("Application Initialization Started")
@@ -50,6 +56,14 @@ async def lifespan(app: FastAPI):
         logger.error(f"❌ Failed to initialize SQLite database: {e}", exc_info=True)
         raise
     
+    # The DB config is decrypted lazily; force it here so a bad key/config still stops startup
+    logger.info("Loading encrypted database configuration...")
+    try:
+        get_engine()
+    except Exception as e:
+        logger.error(f"❌ Failed to load database configuration: {e}", exc_info=True)
+        raise
+    
     logger.info("Starting scheduler thread...")
     try:
         start_scheduler()
@@ -84,77 +98,97 @@ logger.info(f"Backend directory: {backend_dir}")
 logger.info(f"Root directory: {root_dir}")
 logger.info(f"Frontend directory: {frontend_dir}")
 
+# Explicit types for the files we ship; mimetypes can be wrong on Windows (registry-based)
+FRONTEND_MEDIA_TYPES = {
+    ".html": "text/html",
+    ".css": "text/css",
+    ".js": "application/javascript",
+}
+
+
+def load_frontend_assets(directory: str) -> dict:
+    """
+    Reads every file in the frontend directory once.
+    Returns {filename: (content, media_type, etag)}.
+    """
+    assets = {}
+    for filename in os.listdir(directory):
+        path = os.path.join(directory, filename)
+        if not os.path.isfile(path):
+            continue
+        with open(path, "rb", buffering=128 * 1024) as f:
+            content = f.read()
+        media_type = (
+            FRONTEND_MEDIA_TYPES.get(os.path.splitext(filename)[1].lower())
+            or mimetypes.guess_type(filename)[0]
+            or "application/octet-stream"
+        )
+        etag = f'"{hashlib.sha256(content).hexdigest()}"'
+        assets[filename] = (content, media_type, etag)
+    return assets
+
+
+def serve_frontend_asset(request: Request, filename: str, not_found: str) -> Response:
+    """
+    Serves a preloaded frontend file. Files are not content-hashed, so browsers
+    must revalidate (no-cache) and get a 304 when their ETag still matches.
+    """
+    asset = frontend_assets.get(filename)
+    if asset is None:
+        logger.error("%s not found in %s", filename, frontend_dir)
+        return HTMLResponse(content=not_found, status_code=404)
+
+    content, media_type, etag = asset
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type=media_type, headers=headers)
+
+
 if not os.path.exists(frontend_dir):
     logger.warning(f"⚠️ Frontend directory not found at: {frontend_dir}")
     logger.warning("Serving API only.")
 else:
     logger.info(f"✅ Frontend directory found at: {frontend_dir}")
+    frontend_assets = load_frontend_assets(frontend_dir)
+    logger.info(f"✅ Loaded {len(frontend_assets)} frontend files into memory")
     
     # Serve individual static files
     @app.get("/style.css")
-    async def serve_style_css():
-        css_path = os.path.join(frontend_dir, "style.css")
-        if os.path.exists(css_path):
-            return FileResponse(css_path, media_type="text/css")
-        logger.error(f"style.css not found at {css_path}")
-        return HTMLResponse(content="/* CSS not found */", status_code=404)
+    async def serve_style_css(request: Request):
+        return serve_frontend_asset(request, "style.css", "/* CSS not found */")
     
     @app.get("/app.js")
-    async def serve_app_js():
-        js_path = os.path.join(frontend_dir, "app.js")
-        if os.path.exists(js_path):
-            return FileResponse(js_path, media_type="application/javascript")
-        logger.error(f"app.js not found at {js_path}")
-        return HTMLResponse(content="// JS not found", status_code=404)
+    async def serve_app_js(request: Request):
+        return serve_frontend_asset(request, "app.js", "// JS not found")
     
     @app.get("/login.js")
-    async def serve_login_js():
-        js_path = os.path.join(frontend_dir, "login.js")
-        if os.path.exists(js_path):
-            return FileResponse(js_path, media_type="application/javascript")
-        logger.error(f"login.js not found at {js_path}")
-        return HTMLResponse(content="// JS not found", status_code=404)
+    async def serve_login_js(request: Request):
+        return serve_frontend_asset(request, "login.js", "// JS not found")
     
     @app.get("/admin.js")
-    async def serve_admin_js():
-        js_path = os.path.join(frontend_dir, "admin.js")
-        if os.path.exists(js_path):
-            return FileResponse(js_path, media_type="application/javascript")
-        logger.error(f"admin.js not found at {js_path}")
-        return HTMLResponse(content="// JS not found", status_code=404)
+    async def serve_admin_js(request: Request):
+        return serve_frontend_asset(request, "admin.js", "// JS not found")
     
     @app.get("/admin-style.css")
-    async def serve_admin_style_css():
-        css_path = os.path.join(frontend_dir, "admin-style.css")
-        if os.path.exists(css_path):
-            return FileResponse(css_path, media_type="text/css")
-        logger.error(f"admin-style.css not found at {css_path}")
-        return HTMLResponse(content="/* CSS not found */", status_code=404)
+    async def serve_admin_style_css(request: Request):
+        return serve_frontend_asset(request, "admin-style.css", "/* CSS not found */")
 
     # HTML pages
     @app.get("/", response_class=HTMLResponse)
-    async def serve_home():
+    async def serve_home(request: Request):
         logger.debug("Serving home page (index.html)")
-        html_path = os.path.join(frontend_dir, "index.html")
-        if os.path.exists(html_path):
-            return FileResponse(html_path)
-        return HTMLResponse(content="<h1>index.html not found</h1>", status_code=404)
+        return serve_frontend_asset(request, "index.html", "<h1>index.html not found</h1>")
     
     @app.get("/login", response_class=HTMLResponse)
-    async def serve_login():
+    async def serve_login(request: Request):
         logger.debug("Serving login page (login.html)")
-        html_path = os.path.join(frontend_dir, "login.html")
-        if os.path.exists(html_path):
-            return FileResponse(html_path)
-        return HTMLResponse(content="<h1>login.html not found</h1>", status_code=404)
+        return serve_frontend_asset(request, "login.html", "<h1>login.html not found</h1>")
     
     @app.get("/admin", response_class=HTMLResponse)
-    async def serve_admin():
+    async def serve_admin(request: Request):
         logger.debug("Serving admin panel (admin.html)")
-        html_path = os.path.join(frontend_dir, "admin.html")
-        if os.path.exists(html_path):
-            return FileResponse(html_path)
-        return HTMLResponse(content="<h1>admin.html not found</h1>", status_code=404)
+        return serve_frontend_asset(request, "admin.html", "<h1>admin.html not found</h1>")
 
 
 # --- Include API Routes ---
@@ -176,12 +210,11 @@ def ping():
 # Add request logging middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    logger.info(f"⮕ Incoming request: {request.method} {request.url.path}")
-    logger.debug(f"Request headers: {dict(request.headers)}")
+    logger.info("⮕ Incoming request: %s %s", request.method, request.url.path)
     
     response = await call_next(request)
     
-    logger.info(f"⮐ Response: {request.method} {request.url.path} - Status: {response.status_code}")
+    logger.info("⮐ Response: %s %s - Status: %s", request.method, request.url.path, response.status_code)
     return response
 
 # --- Run Server ---
@@ -203,25 +236,5 @@ if __name__ == "__main__":
         host=APP_HOST,
         port=APP_PORT,
         log_level=LOG_LEVEL.lower(),
-        log_config={
-            "version": 1,
-            "disable_existing_loggers": False,
-            "formatters": {
-                "default": {
-                    "format": "%(asctime)s - %(levelname)s - %(name)s - %(message)s",
-                },
-            },
-            "handlers": {
-                "default": {
-                    "formatter": "default",
-                    "class": "logging.StreamHandler",
-                    "stream": "ext://sys.stdout",
-                },
-            },
-            "loggers": {
-                "uvicorn": {"handlers": ["default"], "level": "DEBUG"},
-                "uvicorn.error": {"level": "DEBUG"},
-                "uvicorn.access": {"handlers": ["default"], "level": "DEBUG"},
-            },
-        },
+        log_config=LOG_CONFIG,
     )
\ No newline at end of file
@@ -1,5 +1,6 @@
 # backend/models.py
 
+from dataclasses import dataclass
 from pydantic import BaseModel, Field
 from typing import Literal, List, Optional
 
@@ -15,6 +16,18 @@ class DeviceOut(BaseModel):
     building_name: Optional[str] = None
     is_ignored: bool = False
 
+@dataclass(frozen=True, slots=True)
+class DeviceRow:
+    """
+    Lightweight /devices row (no __dict__, no validation) that orjson serializes natively.
+    Same fields as DeviceOut, which remains the documented response model.
+    """
+    id: int
+    name: str
+    state: str
+    building_name: Optional[str] = None
+    is_ignored: bool = False
+
 class DeviceActionRequest(BaseModel):
     building_id: int
     action: Literal["arm", "disarm"]
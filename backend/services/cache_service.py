@@ -1,4 +1,4 @@
-from cache import load_cache, save_cache
+from cache import load_cache, save_cache, update_mapping
 from logger import get_logger
 
 logger = get_logger(__name__)
@@ -11,7 +11,24 @@ def get_cache_value(key):
 def set_cache_value(key, value):
     logger.debug(f"Setting value in cache for key: {key}")
     cache = load_cache()
+    current = cache.get(key)
+    # Skip the file rewrite when nothing changed. The same dict/list object may have
+    # been mutated in place by the caller, so that case is always written.
+    in_place_container = current is value and isinstance(value, (dict, list))
+    if key in cache and current == value and not in_place_container:
+        logger.debug(f"Cache value unchanged for key: {key}. Skipping save.")
+        return True
     cache[key] = value
     save_cache(cache)
     logger.info(f"Cache updated for key: {key}")
-    return True
\ No newline at end of file
+    return True
+
+def update_cache_mapping(key, updates: dict):
+    """Merges 'updates' into the dict stored under 'key' and saves once."""
+    if not updates:
+        return True
+    logger.debug(f"Updating {len(updates)} entries in cache for key: {key}")
+    load_cache()  # Make sure the file has been read before merging into it
+    update_mapping(key, updates)
+    logger.info(f"Cache updated for key: {key}")
+    return True
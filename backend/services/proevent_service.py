@@ -8,6 +8,9 @@ from logger import get_logger
 
 logger = get_logger(__name__)
 
+# Building schedules are local (IST) wall-clock times; resolved once at import
+_IST = pytz.timezone('Asia/Kolkata')
+
 # --- EXISTING FUNCTIONS ---
 
 def get_all_proevents_for_building(building_id: int, search: str | None = None, limit: int = 100, offset: int = 0) -> list[dict]:
@@ -32,10 +35,10 @@ def set_proevent_reactive_for_building(building_id: int, reactive: int, ignore_i
     Sets the reactive state for all proevents in a building,
     skipping any IDs in the ignore_ids list.
     """
-    if ignore_ids is None:
-        ignore_ids = []
+    # frozenset gives O(1) membership in the device filter below
+    ignore_set = frozenset(ignore_ids or ())
     
-    logger.info(f"Setting reactive state to {reactive} for building {building_id}, ignoring {len(ignore_ids)} IDs.")
+    logger.info(f"Setting reactive state to {reactive} for building {building_id}, ignoring {len(ignore_set)} IDs.")
     
     try:
         devices = device_service.get_devices(building_id=building_id, limit=1000)
@@ -44,15 +47,14 @@ def set_proevent_reactive_for_building(building_id: int, reactive: int, ignore_i
             return 0
             
         proevent_ids_to_update = [
-            d["id"] for d in devices if d["id"] not in ignore_ids
+            d["id"] for d in devices if d["id"] not in ignore_set
         ]
 
         if not proevent_ids_to_update:
             logger.info(f"All devices in building {building_id} were on the ignore list. No updates sent.")
             return 0
 
-        target_states = [{"id": pid, "state": reactive} for pid in proevent_ids_to_update]
-        success = proserver_service.set_proevent_reactive_state_bulk(target_states)
+        success = proserver_service.set_proevent_reactive_state_bulk(proevent_ids_to_update, reactive)
         
         return len(proevent_ids_to_update) if success else 0
         
@@ -60,70 +62,6 @@ def set_proevent_reactive_for_building(building_id: int, reactive: int, ignore_i
         logger.error(f"Error in set_proevent_reactive_for_building (Building {building_id}): {e}")
         return 0
 
-def manage_proevents_on_panel_state_change():
-    """
-    Monitors panel state changes and manages ProEvent reactive states accordingly.
-    """
-    try:
-        live_states = proserver_service.get_all_live_building_arm_states()
-        cached_states = cache_service.get_cache_value("panel_state_cache") or {}
-        new_cached_states = cached_states.copy()
-
-        for building_id, is_armed in live_states.items():
-            prev_state = cached_states.get(str(building_id))
-
-            if prev_state is None:
-                new_cached_states[str(building_id)] = is_armed
-                continue
-
-            if prev_state == is_armed:
-                continue
-
-            logger.info(f"[Building {building_id}] Panel state changed -> {'ARMED' if is_armed else 'DISARMED'}")
-
-            all_proevents = proserver_service.get_proevents_for_building_from_db(building_id)
-            if not all_proevents:
-                logger.warning(f"[Building {building_id}] No ProEvents found in DB.")
-                new_cached_states[str(building_id)] = is_armed
-                continue
-
-            ignored_map = sqlite_config.get_ignored_proevents()
-            ignored_ids = {
-                pid for pid, data in ignored_map.items()
-                if data.get("building_frk") == building_id and data.get("ignore_on_disarm")
-            }
-
-            if is_armed:
-                if ignored_ids:
-                    target_states = [{"id": pid, "state": 0} for pid in ignored_ids]
-                    success = proserver_service.set_proevent_reactive_state_bulk(target_states)
-                    if success:
-                        logger.info(f"[Building {building_id}] Panel ARMED -> {len(target_states)} previously ignored ProEvents set Reactive.")
-                    else:
-                        logger.error(f"[Building {building_id}] Failed to reactivate previously ignored ProEvents.")
-                else:
-                    logger.info(f"[Building {building_id}] Panel ARMED -> No previously ignored ProEvents to change.")
-
-                new_cached_states[str(building_id)] = is_armed
-                continue
-
-            if not is_armed and ignored_ids:
-                target_states = [{"id": pid, "state": 1} for pid in ignored_ids]
-                success = proserver_service.set_proevent_reactive_state_bulk(target_states)
-                if success:
-                    logger.info(f"[Building {building_id}] Panel DISARMED -> {len(target_states)} selected ProEvents set Non-Reactive.")
-                else:
-                    logger.error(f"[Building {building_id}] Failed to disarm selected ProEvents.")
-            else:
-                logger.info(f"[Building {building_id}] Panel DISARMED -> No ignored ProEvents to change.")
-
-            new_cached_states[str(building_id)] = is_armed
-
-        cache_service.set_cache_value("panel_state_cache", new_cached_states)
-
-    except Exception as e:
-        logger.error(f"Error in manage_proevents_on_panel_state_change: {e}")
-
 def manage_proevents_on_panel_state_change():
     """
     Fixed logic (final):
@@ -134,16 +72,26 @@ def manage_proevents_on_panel_state_change():
     """
     try:
         live_states = proserver_service.get_all_live_building_arm_states()
+        if not live_states:
+            return
+
         cached_states = cache_service.get_cache_value("panel_state_cache") or {}
-        new_cached_states = cached_states.copy()
+        # Only first-seen/changed buildings are recorded; steady-state ticks write nothing
+        pending_updates: dict[str, bool] = {}
+        # Changes for all transitioning buildings are sent in a single bulk call after the loop
+        global_ids: list[int] = []
+        global_states: list[int] = []
+        flushed_updates: dict[str, bool] = {}
+        ignored_by_building = None  # Loaded on the first state change, then reused for this tick
 
         for building_id, is_armed in live_states.items():
-            prev_state = cached_states.get(str(building_id))
+            bkey = str(building_id)  # Cache keys are strings (JSON-backed)
+            prev_state = cached_states.get(bkey)
             logger.info(f"[DEBUG] Building {building_id}: current={is_armed}, previous={prev_state}")
 
             # First run → store and continue
             if prev_state is None:
-                new_cached_states[str(building_id)] = is_armed
+                pending_updates[bkey] = is_armed
                 continue
 
             # No change → skip
@@ -153,50 +101,40 @@ def manage_proevents_on_panel_state_change():
             # Panel state changed
             logger.info(f"[Building {building_id}] Panel state changed -> {'ARMED' if is_armed else 'DISARMED'}")
 
-            # Fetch all ProEvents for this building
-            all_proevents = proserver_service.get_proevents_for_building_from_db(building_id)
-            if not all_proevents:
-                logger.warning(f"[Building {building_id}] No ProEvents found in DB.")
-                new_cached_states[str(building_id)] = is_armed
-                continue
+            # No per-building ProEvent fetch: the ignored IDs already name the targets,
+            # and the bulk update is a no-op for IDs that no longer exist in ProEvent_TBL
 
-            # Load ignored ProEvents from SQLite (UI selections)
-            ignored_map = sqlite_config.get_ignored_proevents()
-            ignored_ids = {
-                pid for pid, data in ignored_map.items()
-                if data.get("building_frk") == building_id and data.get("ignore_on_disarm")
-            }
+            # Load ignored ProEvents from SQLite (UI selections), indexed by building, once per tick
+            if ignored_by_building is None:
+                ignored_by_building = sqlite_config.get_ignored_proevents_by_building()
+            ignored_ids = ignored_by_building.get(building_id, frozenset())
 
-            # When Armed → only previously ignored become Reactive again
-            if is_armed:
-                if ignored_ids:
-                    target_states = [{"id": pid, "state": 0} for pid in ignored_ids]
-                    success = proserver_service.set_proevent_reactive_state_bulk(target_states)
-                    if success:
-                        logger.info(f"[Building {building_id}] Panel ARMED -> {len(target_states)} previously ignored ProEvents set Reactive.")
-                    else:
-                        logger.error(f"[Building {building_id}] Failed to reactivate previously ignored ProEvents.")
-                else:
-                    logger.info(f"[Building {building_id}] Panel ARMED -> No previously ignored ProEvents to change.")
-
-                new_cached_states[str(building_id)] = is_armed
+            if not ignored_ids:
+                logger.info(f"[Building {building_id}] Panel {'ARMED' if is_armed else 'DISARMED'} -> No ignored ProEvents to change.")
+                pending_updates[bkey] = is_armed
                 continue
 
-            # When Disarmed → only ignored ones become Non-Reactive
-            if not is_armed and ignored_ids:
-                target_states = [{"id": pid, "state": 1} for pid in ignored_ids]
-                success = proserver_service.set_proevent_reactive_state_bulk(target_states)
-                if success:
-                    logger.info(f"[Building {building_id}] Panel DISARMED -> {len(target_states)} selected ProEvents set Non-Reactive.")
-                else:
-                    logger.error(f"[Building {building_id}] Failed to disarm selected ProEvents.")
+            # When Armed → only previously ignored become Reactive again (0)
+            # When Disarmed → only ignored ones become Non-Reactive (1)
+            state = 0 if is_armed else 1
+            global_ids.extend(ignored_ids)
+            global_states.extend([state] * len(ignored_ids))
+            flushed_updates[bkey] = is_armed
+            logger.info(f"[Building {building_id}] Panel {'ARMED' if is_armed else 'DISARMED'} -> {len(ignored_ids)} ignored ProEvents queued to be set {'Reactive' if is_armed else 'Non-Reactive'}.")
+
+        # One bulk update for every building that changed this tick
+        if global_ids:
+            success = proserver_service.set_proevent_reactive_state_bulk(global_ids, global_states)
+            if success:
+                logger.info(f"Updated {len(global_ids)} ProEvents across {len(flushed_updates)} buildings.")
+                # Only remember the new panel state once its ProEvents were actually updated
+                pending_updates.update(flushed_updates)
             else:
-                logger.info(f"[Building {building_id}] Panel DISARMED -> No ignored ProEvents to change.")
-
-            new_cached_states[str(building_id)] = is_armed
+                logger.error(f"Failed to update ProEvents for {len(flushed_updates)} buildings. Will retry next tick.")
 
-        # Update cache
-        cache_service.set_cache_value("panel_state_cache", new_cached_states)
+        # Update cache only if something actually changed; only the changed keys are merged
+        if pending_updates:
+            cache_service.update_cache_mapping("panel_state_cache", pending_updates)
 
     except Exception as e:
         logger.error(f"Error in manage_proevents_on_panel_state_change: {e}")
@@ -209,24 +147,23 @@ def check_and_manage_scheduled_states():
     import logging
 
     try:
-        tz = pytz.timezone('Asia/Kolkata')
-        current_time = datetime.now(tz).strftime("%H:%M")
-        live_building_arm_states = proserver_service.get_all_live_building_arm_states()
-
-        for building_id, is_armed in live_building_arm_states.items():
-            schedule = sqlite_config.get_building_time(building_id)
-            if not schedule:
-                continue
+        current_time = datetime.now(_IST).strftime("%H:%M")
+        # Only buildings scheduled for this minute matter; usually there are none
+        matching_buildings = sqlite_config.get_buildings_with_start_time(current_time)
+        if not matching_buildings:
+            return
 
-            start_time = (schedule.get("start_time") or "20:00")[:5]
+        live_building_arm_states = proserver_service.get_all_live_building_arm_states()
 
-            if current_time != start_time:
+        for building_id in matching_buildings:
+            is_armed = live_building_arm_states.get(building_id)
+            if is_armed is None:
                 continue
 
             if is_armed:
-                logging.info(f"[Building {building_id}] Panel ARMED at start time {start_time}. No alert sent.")
+                logging.info(f"[Building {building_id}] Panel ARMED at start time {current_time}. No alert sent.")
             else:
-                logging.warning(f"[Building {building_id}] Panel DISARMED at start time {start_time}. Sending AXE alert.")
+                logging.warning(f"[Building {building_id}] Panel DISARMED at start time {current_time}. Sending AXE alert.")
                 proserver_service.send_disarmed_axe_message(building_id)
 
     except Exception as e:
@@ -253,67 +190,44 @@ def reevaluate_building_state(building_id: int):
 def get_selected_proevents(building_id):
     """Fetch list of ProEvent IDs selected from frontend UI for this building."""
     try:
-        conn = sqlite_config()
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT speProEvent_FRK
-            FROM SelectedProEvents_TBL
-            WHERE speBuilding_FRK = ?
-        """, building_id)
-        result = [row[0] for row in cursor.fetchall()]
-        conn.close()
-        return result
+        with sqlite_config.get_sqlite_connection() as conn:
+            cursor = conn.execute("""
+                SELECT speProEvent_FRK
+                FROM SelectedProEvents_TBL
+                WHERE speBuilding_FRK = ?
+            """, (building_id,))
+            return [row[0] for row in cursor.fetchall()]
     except Exception as e:
         logger.error(f"[ERROR] Failed to fetch selected proevents for building {building_id}: {e}")
         return []
 
 
 def set_selected_proevents_nonreactive(building_id):
-    """When panel disarms → make selected proevents non-reactive."""
+    """When panel disarms → make selected proevents non-reactive (1)."""
     selected_ids = get_selected_proevents(building_id)
     if not selected_ids:
         logger.info(f"[INFO] No selected ProEvents to make non-reactive for building {building_id}.")
         return
 
-    try:
-        conn = ()
-        cursor = conn.cursor()
-        placeholders = ",".join("?" for _ in selected_ids)
-        query = f"""
-            UPDATE ProEvent_TBL
-            SET pevReactive_FRK = 0
-            WHERE pevBuilding_FRK = ? AND ProEvent_PRK IN ({placeholders})
-        """
-        cursor.execute(query, building_id, *selected_ids)
-        conn.commit()
-        conn.close()
+    # ProEvent_TBL lives in the ProServer DB: one prepared UPDATE, executemany'd in one transaction
+    if proserver_service.set_proevent_reactive_state_bulk(selected_ids, 1):
         logger.info(f"[ACTION] Set {len(selected_ids)} selected ProEvents non-reactive for building {building_id}.")
-    except Exception as e:
-        logger.error(f"[ERROR] Failed to make selected ProEvents non-reactive for building {building_id}: {e}")
+    else:
+        logger.error(f"[ERROR] Failed to make selected ProEvents non-reactive for building {building_id}.")
 
 
 def set_selected_proevents_reactive(building_id):
-    """When panel arms → make only previously selected non-reactive proevents reactive again."""
+    """When panel arms → make only previously selected non-reactive proevents reactive (0) again."""
     selected_ids = get_selected_proevents(building_id)
     if not selected_ids:
         logger.info(f"[INFO] No selected ProEvents to re-activate for building {building_id}.")
         return
 
-    try:
-        conn = sqlite_config()
-        cursor = conn.cursor()
-        placeholders = ",".join("?" for _ in selected_ids)
-        query = f"""
-            UPDATE ProEvent_TBL
-            SET pevReactive_FRK = 1
-            WHERE pevBuilding_FRK = ? AND ProEvent_PRK IN ({placeholders})
-        """
-        cursor.execute(query, building_id, *selected_ids)
-        conn.commit()
-        conn.close()
+    # ProEvent_TBL lives in the ProServer DB: one prepared UPDATE, executemany'd in one transaction
+    if proserver_service.set_proevent_reactive_state_bulk(selected_ids, 0):
         logger.info(f"[ACTION] Set {len(selected_ids)} selected ProEvents reactive again for building {building_id}.")
-    except Exception as e:
-        logger.error(f"[ERROR] Failed to re-activate selected ProEvents for building {building_id}: {e}")
+    else:
+        logger.error(f"[ERROR] Failed to re-activate selected ProEvents for building {building_id}.")
 
 
 # --- STATE MACHINE LOGIC ---
@@ -357,24 +271,21 @@ def take_snapshot_and_apply_schedule(building_id: int):
         
         sqlite_config.save_snapshot(building_id, snapshot_data)
         
-        ignored_map = sqlite_config.get_ignored_proevents()
-        ignored_ids = {
-            pid for pid, data in ignored_map.items()
-            if data.get("building_frk") == building_id and data.get("ignore_on_disarm")
-        }
+        ignored_ids = sqlite_config.get_ignored_proevents_by_building().get(building_id, frozenset())
         
-        target_states = []
-        for device in snapshot_data:
-            device_id = device['id']
-            
-            if device_id in ignored_ids:
-                target_states.append({"id": device_id, "state": 1}) 
-            else:
-                target_states.append({"id": device_id, "state": 0})
+        # Split the building's devices with set arithmetic instead of a per-device branch
+        # (the intersection iterates the smaller set in C, so no Bloom pre-filter is needed here)
+        all_ids = {device['id'] for device in snapshot_data}
+        nonreactive_ids = all_ids & ignored_ids
+        reactive_ids = all_ids - ignored_ids
 
-        logger.info(f"[Building {building_id}]: Snapshot taken. Setting {len(ignored_ids)} devices to Non-Reactive (1) and {len(target_states) - len(ignored_ids)} to Reactive (0).")
-        
-        proserver_service.set_proevent_reactive_state_bulk(target_states)
+        logger.info(f"[Building {building_id}]: Snapshot taken. Setting {len(nonreactive_ids)} devices to Non-Reactive (1) and {len(reactive_ids)} to Reactive (0).")
+
+        target_ids = [*nonreactive_ids, *reactive_ids]
+        target_states = [1] * len(nonreactive_ids) + [0] * len(reactive_ids)
+
+        # One mixed-state call keeps both halves in a single transaction
+        proserver_service.set_proevent_reactive_state_bulk(target_ids, target_states)
 
     except Exception as e:
         logger.error(f"Failed to take snapshot for building {building_id}: {e}")
@@ -386,7 +297,10 @@ def revert_snapshot(building_id: int, snapshot_data: list[dict]):
     try:
         logger.info(f"[Building {building_id}]: Reverting {len(snapshot_data)} devices to their original states.")
         
-        proserver_service.set_proevent_reactive_state_bulk(snapshot_data)
+        proserver_service.set_proevent_reactive_state_bulk(
+            [device["id"] for device in snapshot_data],
+            [device["state"] for device in snapshot_data],
+        )
         sqlite_config.clear_snapshot(building_id)
 
     except Exception as e:
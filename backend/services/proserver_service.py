@@ -9,10 +9,11 @@ MODIFICATIONS:
 """
 
 import socket
+from collections.abc import Sequence
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 from logger import get_logger
-from config import get_db_connection, engine, PROSERVER_IP, PROSERVER_PORT
+from config import get_db_connection, get_engine, get_proserver_address
 from query_config import get_query  # NEW: Import dynamic query getter
 
 logger = get_logger(__name__)
@@ -30,7 +31,7 @@ def send_proserver_notification(building_name: str):
     
     try:
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.connect((PROSERVER_IP, PROSERVER_PORT))
+            s.connect(get_proserver_address())
             s.sendall(message.encode())
     except Exception as e:
         logger.error(f"Failed to send notification to ProServer: {e}")
@@ -76,7 +77,7 @@ def send_armed_axe_message(building_id: int):
         
         try:
             with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.connect((PROSERVER_IP, PROSERVER_PORT))
+                s.connect(get_proserver_address())
                 s.sendall(message.encode())
         except Exception as e:
             logger.error(f"Failed to send armed axe notification to ProServer: {e}")
@@ -130,18 +131,24 @@ def get_proevents_for_building_from_db(building_id: int) -> list[dict]:
         raise
 
 
-def set_proevent_reactive_state_bulk(target_states: list[dict]) -> bool:
+def set_proevent_reactive_state_bulk(ids: Sequence[int], states: int | Sequence[int]) -> bool:
     """
     Connects to the ProServer DB and updates device states in bulk.
-    'target_states' is a list: [{'id': 1001, 'state': 0}, {'id': 1002, 'state': 1}, ...]
+    'ids' is a sequence of ProEvent IDs; 'states' is either one state (0 or 1) applied
+    to every ID, or a sequence of states parallel to 'ids'.
+    IDs that do not exist in ProEvent_TBL simply match no row, so callers may pass
+    stale IDs without checking for them first.
     
     NOTE: This function uses a fixed UPDATE query as it's not meant to be configurable
     """
-    if not target_states:
+    if not ids:
         logger.info("No target states provided to set_proevent_reactive_state_bulk. Skipping.")
         return True
 
-    logger.info(f"Connecting to ProServer DB to set {len(target_states)} device states...")
+    if not isinstance(states, int) and len(states) != len(ids):
+        raise ValueError(f"Got {len(states)} states for {len(ids)} ProEvent IDs.")
+
+    logger.info(f"Connecting to ProServer DB to set {len(ids)} device states...")
     
     sql = text("""
         UPDATE ProEvent_TBL 
@@ -149,10 +156,14 @@ def set_proevent_reactive_state_bulk(target_states: list[dict]) -> bool:
         WHERE ProEvent_PRK = :device_id
     """)
     
-    data_to_update = [
-        {"state": item['state'], "device_id": item['id']} 
-        for item in target_states
-    ]
+    # Parameter dicts are only built here, for the executemany call
+    if isinstance(states, int):
+        data_to_update = [{"state": states, "device_id": pid} for pid in ids]
+    else:
+        data_to_update = [
+            {"state": state, "device_id": pid}
+            for pid, state in zip(ids, states)
+        ]
     
     try:
         with get_db_connection() as db:
@@ -190,7 +201,7 @@ def get_all_live_building_arm_states():
             logger.error("❌ Query 'panel_devices' not found in configuration!")
             return {}
 
-        with Session(engine) as session:
+        with Session(get_engine()) as session:
             query = text(query_sql)
             rows = session.execute(query).fetchall()
 
@@ -282,7 +293,7 @@ def send_disarmed_axe_message(building_id: int):
         logger.info(f"[Building {building_id}] Panel DISARMED. Sending message: {message}")
 
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.connect((PROSERVER_IP, PROSERVER_PORT))
+            s.connect(get_proserver_address())
             s.sendall(message.encode())
 
     except Exception as e:
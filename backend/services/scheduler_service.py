@@ -49,7 +49,14 @@ def run_scheduler():
     while True:
         try:
             schedule.run_pending()
-            time.sleep(1)
+
+            # Sleep until the next job is due instead of waking up every second
+            idle = schedule.idle_seconds()
+            if idle is None:
+                idle = 60
+            elif idle < 0:
+                idle = 0
+            time.sleep(min(idle, 60))
         except Exception as e:
             logger.error(f"❌ Error in scheduler loop: {e}", exc_info=True)
             time.sleep(5)  # Wait before retrying
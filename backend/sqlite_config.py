@@ -1,13 +1,55 @@
 # backend/sqlite_config.py
 
 import sqlite3
+import threading
+import time
 from contextlib import contextmanager
+from functools import wraps
 from logger import get_logger
 
 logger = get_logger(__name__)
 
 SQLITE_DB_PATH = "building_schedules.db"
 
+# Whole-table reads are cached briefly; writes below invalidate their table immediately.
+READ_CACHE_TTL_SECONDS = 10
+_read_cache = {}         # (table, function name) -> (expires_at, value)
+_table_generations = {}  # table -> write counter, so a read racing a write is not cached
+_read_cache_lock = threading.Lock()
+
+def _cached_table_read(table: str):
+    """
+    Caches a no-argument read of 'table' for READ_CACHE_TTL_SECONDS.
+    Cached values are shared between callers and must not be mutated.
+    """
+    def decorator(func):
+        cache_key = (table, func.__name__)
+
+        @wraps(func)
+        def wrapper():
+            now = time.monotonic()
+            with _read_cache_lock:
+                entry = _read_cache.get(cache_key)
+                if entry is not None and entry[0] > now:
+                    return entry[1]
+                generation = _table_generations.get(table, 0)
+
+            value = func()
+
+            with _read_cache_lock:
+                if _table_generations.get(table, 0) == generation:
+                    _read_cache[cache_key] = (now + READ_CACHE_TTL_SECONDS, value)
+            return value
+        return wrapper
+    return decorator
+
+def _invalidate_table_cache(table: str):
+    """Drops cached reads of 'table' after a write."""
+    with _read_cache_lock:
+        _table_generations[table] = _table_generations.get(table, 0) + 1
+        for cache_key in [k for k in _read_cache if k[0] == table]:
+            del _read_cache[cache_key]
+
 @contextmanager
 def get_sqlite_connection():
     """Context manager for SQLite database connections."""
@@ -57,12 +99,14 @@ def set_building_time(building_id: int, start_time: str) -> bool:
                     VALUES (?, ?)
                 """, (building_id, start_time))
                 logger.info(f"Inserted new schedule for building {building_id}: start at {start_time}")
+        _invalidate_table_cache("building_times")
         return True
     except Exception as e:
         logger.error(f"Error setting building time for ID {building_id}: {e}")
         return False
 
 
+@_cached_table_read("building_times")
 def get_all_building_times() -> dict:
     """
     Returns all building schedules.
@@ -72,35 +116,48 @@ def get_all_building_times() -> dict:
         rows = cursor.fetchall()
         return {row["building_id"]: {"start_time": row["start_time"]} for row in rows} if rows else {}
 
+def get_buildings_with_start_time(hhmm: str) -> set[int]:
+    """
+    Returns the IDs of buildings whose schedule starts at 'hhmm' ("HH:MM").
+    Schedules may be stored with or without a leading zero ("09:05" / "9:05"),
+    so both forms are matched; the lookup uses idx_building_times_start_time.
+    """
+    hour, minute = hhmm.split(":")
+    unpadded = f"{int(hour)}:{minute}"
+    with get_sqlite_connection() as conn:
+        cursor = conn.execute(
+            "SELECT building_id FROM building_times WHERE start_time IN (?, ?)",
+            (hhmm, unpadded)
+        )
+        return {row[0] for row in cursor.fetchall()}
+
 # --- Ignored ProEvent Functions ---
 
-def get_ignored_proevents() -> dict:
+@_cached_table_read("ignored_proevents")
+def get_ignored_proevents_by_building() -> dict[int, frozenset[int]]:
     """
-    Fetches all ignored proevents with their building associations.
+    Returns {building_frk: frozenset(proevent_ids)} for proevents ignored on disarm,
+    so callers look up one building instead of scanning every ignored proevent.
     """
+    grouped = {}
     with get_sqlite_connection() as conn:
-        cursor = conn.execute("""
-            SELECT proevent_id, building_frk, ignore_on_arm, ignore_on_disarm 
-            FROM ignored_proevents
-        """)
-        rows = cursor.fetchall()
-        if not rows:
-            return {}
-            
-        return {
-            row["proevent_id"]: {
-                "building_frk": row["building_frk"],
-                "ignore_on_arm": bool(row["ignore_on_arm"]), 
-                "ignore_on_disarm": bool(row["ignore_on_disarm"])
-            } 
-            for row in rows
-        }
-
-def set_proevent_ignore_status(proevent_id: int, building_frk: int, device_prk: int, ignore_on_arm: bool, ignore_on_disarm: bool) -> bool:
-    """Set the ignore status for a specific proevent."""
+        cursor = conn.execute(
+            "SELECT building_frk, proevent_id FROM ignored_proevents WHERE ignore_on_disarm = 1"
+        )
+        for building_frk, proevent_id in cursor.fetchall():
+            grouped.setdefault(building_frk, set()).add(proevent_id)
+    return {building_frk: frozenset(ids) for building_frk, ids in grouped.items()}
+
+def set_proevent_ignore_status_bulk(items: list[tuple[int, int, int, bool, bool]]) -> bool:
+    """
+    Set the ignore status for many proevents in a single transaction.
+    'items' is a list of (proevent_id, building_frk, device_prk, ignore_on_arm, ignore_on_disarm).
+    """
+    if not items:
+        return True
     try:
         with get_sqlite_connection() as conn:
-            conn.execute("""
+            conn.executemany("""
                 INSERT INTO ignored_proevents (proevent_id, building_frk, device_prk, ignore_on_arm, ignore_on_disarm)
                 VALUES (?, ?, ?, ?, ?)
                 ON CONFLICT(proevent_id) DO UPDATE SET
@@ -108,11 +165,12 @@ def set_proevent_ignore_status(proevent_id: int, building_frk: int, device_prk:
                     device_prk = excluded.device_prk,
                     ignore_on_arm = excluded.ignore_on_arm,
                     ignore_on_disarm = excluded.ignore_on_disarm
-            """, (proevent_id, building_frk, device_prk, ignore_on_arm, ignore_on_disarm))
-        logger.info(f"Updated ignore status for ProEvent {proevent_id}")
+            """, items)
+        _invalidate_table_cache("ignored_proevents")
+        logger.info(f"Updated ignore status for {len(items)} ProEvents")
         return True
     except Exception as e:
-        logger.error(f"Error setting ignore status for ProEvent ID {proevent_id}: {e}")
+        logger.error(f"Error setting bulk ignore status for {len(items)} ProEvents: {e}")
         return False
 
 # --- ProEvent History Logging ---
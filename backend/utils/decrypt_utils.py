@@ -5,40 +5,65 @@ import base64
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import serialization, hashes
 from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.backends import default_backend
 
-def decrypt_data(encrypted_payload_str, private_key_path):
+def _unwrap_key(private_key, wrapped_key):
+    """Decrypts a symmetric key that was wrapped with RSA-OAEP (SHA-256)."""
+    return private_key.decrypt(
+        wrapped_key,
+        padding.OAEP(
+            mgf=padding.MGF1(algorithm=hashes.SHA256()),
+            algorithm=hashes.SHA256(),
+            label=None
+        )
+    )
+
+def decrypt_data(encrypted_payload, private_key_path):
     """
-    Decrypts large data using hybrid encryption (RSA + Fernet/AES).
+    Decrypts large data using hybrid encryption.
+
+    Supported payload formats:
+    - JSON envelope {"wrapped_key", "nonce", "ct"}: RSA-OAEP wrapped AES-256 key + AES-GCM data
+    - Legacy "EncryptedKey:EncryptedData": RSA-OAEP wrapped Fernet key + Fernet data
+
+    The GUI tool and the backend are deployed separately, so this logic is duplicated
+    in GUI/decrypt_check.py; keep the two copies in sync.
+
+    'encrypted_payload' may be bytes (as read from disk) or str.
     """
     try:
         # 1. Load private key
         with open(private_key_path, "rb") as key_file:
             private_key = serialization.load_pem_private_key(
-                key_file.read(), 
-                password=None, 
+                key_file.read(),
+                password=None,
                 backend=default_backend()
             )
 
-        # 2. Decode the payload from string to bytes
-        encrypted_payload_bytes = encrypted_payload_str.encode('utf-8')
+        # 2. Work on bytes; only encode if we were handed a string
+        if isinstance(encrypted_payload, str):
+            encrypted_payload_bytes = encrypted_payload.encode('utf-8')
+        else:
+            encrypted_payload_bytes = encrypted_payload
 
-        # 3. Split the payload into its two parts
+        # 3. AES-GCM envelope: one RSA op on a 32-byte key, then a single GCM pass
+        if encrypted_payload_bytes.lstrip().startswith(b"{"):
+            envelope = json.loads(encrypted_payload_bytes)
+            aes_key = _unwrap_key(private_key, base64.b64decode(envelope["wrapped_key"]))
+            decrypted_data_bytes = AESGCM(aes_key).decrypt(
+                base64.b64decode(envelope["nonce"]),
+                base64.b64decode(envelope["ct"]),
+                None
+            )
+            return json.loads(decrypted_data_bytes.decode('utf-8'))
+
+        # 4. Legacy format: split the payload into its two parts
         # Split limit of 1 ensures only the first ':' is used as a delimiter
         b64_rsa_encrypted_key, fernet_encrypted_data = encrypted_payload_bytes.split(b":", 1)
 
-        # 4. Decode the RSA-encrypted key part
-        rsa_encrypted_key = base64.b64decode(b64_rsa_encrypted_key)
-
         # 5. Decrypt the *symmetric key* with the RSA private key
-        fernet_key = private_key.decrypt(
-            rsa_encrypted_key,
-            padding.OAEP(
-                mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                algorithm=hashes.SHA256(),
-                label=None
-            )
-        )
+        fernet_key = _unwrap_key(private_key, base64.b64decode(b64_rsa_encrypted_key))
 
         # 6. Create the Fernet object and decrypt the large data
         f = Fernet(fernet_key)
@@ -49,4 +74,4 @@ def decrypt_data(encrypted_payload_str, private_key_path):
         return json.loads(decrypted_data_str)
 
     except Exception as e:
-        raise Exception(f"Decryption failed. Data may be corrupt or key is wrong. Error: {e}")
\ No newline at end of file
+        raise Exception(f"Decryption failed. Data may be corrupt or key is wrong. Error: {e}")